@@ -26,7 +26,7 @@ with podman.Client() as client:
         print_history(client.images.get(ctnr.imageid).history())
 
         # Make changes as we save the container to a new image
-        id = ctnr.commit('alpine-ash', changes=['CMD=/bin/ash'])
+        id = ctnr.commit('alpine-ash', change=['CMD=/bin/ash'])
         print_history(client.images.get(id).history())
     else:
         print('Unable to find "alpine" container.', file=sys.stderr)
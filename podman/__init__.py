@@ -1,19 +1,37 @@
 """A client for communicating with a Podman server."""
+import importlib
+import sys
+import typing
 
-from pbr.version import VersionInfo
+if typing.TYPE_CHECKING:
+    # Resolve exported names for linters and IDEs, see _LAZY
+    from .client import Client
+    from .libs import FoldedString  # noqa: F401
+    from .libs import datetime_format, datetime_parse
+    from .libs.errors import (ContainerNotFound, ErrorOccurred,
+                              ImageNotFound, InvalidState,
+                              NoContainerRunning, NoContainersInPod,
+                              PodContainerError, PodmanError, PodNotFound)
 
-from .client import Client
-from .libs import FoldedString, datetime_format, datetime_parse
-from .libs.errors import (ContainerNotFound, ErrorOccurred, ImageNotFound,
-                          InvalidState, NoContainerRunning, NoContainersInPod,
-                          PodContainerError, PodmanError, PodNotFound)
+# Subpackages, imported on first access
+_SUBMODULES = frozenset(('client', 'libs'))
 
-assert FoldedString
-
-try:
-    __version__ = VersionInfo("podman")
-except Exception:  # pylint: disable=broad-except
-    __version__ = '0.0.0'
+# Exported names, imported from their module on first access
+_LAZY = {
+    'Client': '.client',
+    'ContainerNotFound': '.libs.errors',
+    'datetime_format': '.libs',
+    'datetime_parse': '.libs',
+    'ErrorOccurred': '.libs.errors',
+    'FoldedString': '.libs',
+    'ImageNotFound': '.libs.errors',
+    'InvalidState': '.libs.errors',
+    'NoContainerRunning': '.libs.errors',
+    'NoContainersInPod': '.libs.errors',
+    'PodContainerError': '.libs.errors',
+    'PodmanError': '.libs.errors',
+    'PodNotFound': '.libs.errors',
+}
 
 __all__ = [
     'Client',
@@ -29,3 +47,41 @@ __all__ = [
     'PodmanError',
     'PodNotFound',
 ]
+
+
+def _version():
+    try:
+        from pbr.version import VersionInfo
+        return VersionInfo("podman")
+    except Exception:  # pylint: disable=broad-except
+        return '0.0.0'
+
+
+def __getattr__(name):
+    """Import exported names when first used."""
+    if name == '__version__':
+        value = _version()
+    elif name in _SUBMODULES:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        try:
+            module = _LAZY[name]
+        except KeyError:
+            raise AttributeError('module {!r} has no attribute {!r}'.format(
+                __name__, name))
+        value = getattr(importlib.import_module(module, __name__), name)
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List module attributes, including those not yet imported."""
+    return sorted(
+        set(globals()) | set(_LAZY) | _SUBMODULES | {'__version__'})
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ (PEP 562) is not supported, import everything now
+    for _name in list(_LAZY) + ['__version__']:
+        __getattr__(_name)
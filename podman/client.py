@@ -1,36 +1,63 @@
 """A client for communicating with a Podman varlink service."""
+import contextlib
 import errno
+import functools
 import logging
 import os
+import threading
+import weakref
 from urllib.parse import urlparse
 
 from varlink import Client as VarlinkClient
 from varlink import VarlinkError
 
 from .libs import cached_property
+from .libs.batch import Batch
 from .libs.containers import Containers
 from .libs.errors import error_factory
 from .libs.images import Images
 from .libs.pods import Pods
 from .libs.system import System
-from .libs.tunnel import Context, Portal, Tunnel
+from .libs.tunnel import Context, Tunnel, shared_portal
+
+_ALLOWED_KWARGS = frozenset(
+    (
+        "uri",
+        "interface",
+        "remote_uri",
+        "identity_file",
+        "ignore_hosts",
+        "known_hosts",
+    )
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_uri(uri):
+    """Parse uri, results are cached as clients reuse the same uris."""
+    return urlparse(uri)
 
 
 class BaseClient:
     """Context manager for API workers to access varlink."""
 
-    def __init__(self, context):
+    def __init__(self, context, list_ttl=0):
         """Construct Client."""
         self._client = None
-        self._iface = None
+        self._ifaces = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
         self._context = context
+        # Short lived replies of listing calls, see Containers.list()
+        self.list_ttl = list_ttl
+        self.listings = {}
 
     def __call__(self):
         """Support being called for old API."""
         return self
 
     @classmethod
-    def factory(cls, uri=None, interface="io.podman", **kwargs):
+    def factory(cls, uri=None, interface="io.podman", list_ttl=0, **kwargs):
         """Construct a Client based on input."""
         log_level = os.environ.get("PODMAN_LOG_LEVEL")
         if log_level is not None:
@@ -45,22 +72,13 @@ class BaseClient:
         if interface is None:
             raise ValueError("interface is required and cannot be None")
 
-        unsupported = set(kwargs.keys()).difference(
-            (
-                "uri",
-                "interface",
-                "remote_uri",
-                "identity_file",
-                "ignore_hosts",
-                "known_hosts",
-            )
-        )
+        unsupported = kwargs.keys() - _ALLOWED_KWARGS
         if unsupported:
             raise ValueError(
                 "Unknown keyword arguments: {}".format(", ".join(unsupported))
             )
 
-        local_path = urlparse(uri).path
+        local_path = _parse_uri(uri).path
         if not local_path:
             raise ValueError(
                 "path is required for uri,"
@@ -68,7 +86,7 @@ class BaseClient:
             )
 
         if kwargs.get("remote_uri") is None:
-            return LocalClient(Context(uri, interface))
+            return LocalClient(Context(uri, interface), list_ttl)
 
         required = (
             "{} is required, expected format"
@@ -79,7 +97,7 @@ class BaseClient:
         if kwargs.get("remote_uri") is None:
             raise ValueError(required.format("remote_uri"))
 
-        remote = urlparse(kwargs["remote_uri"])
+        remote = _parse_uri(kwargs["remote_uri"])
         if remote.username is None:
             raise ValueError(required.format("username"))
         if remote.path == "":
@@ -99,31 +117,155 @@ class BaseClient:
                 kwargs.get("identity_file"),
                 kwargs.get("ignore_hosts"),
                 kwargs.get("known_hosts"),
-            )
+            ),
+            list_ttl,
         )
 
-    def open(self):
-        """Open connection to podman service."""
-        self._client = VarlinkClient(address=self._context.uri)
-        self._iface = self._client.open(self._context.interface)
+    def connect(self):
+        """Open a new connection to podman service, owned by the caller."""
+        with self._lock:
+            if self._client is None:
+                self._client = VarlinkClient(address=self._context.uri)
+            iface = self._client.open(self._context.interface)
         logging.debug(
             "%s opened varlink connection %s",
             type(self).__name__,
-            str(self._iface),
+            str(iface),
         )
-        return self._iface
+        return iface
+
+    @contextlib.contextmanager
+    def dedicated(self):
+        """Context for a new connection owned by the caller.
+
+        For calls leaving the connection unfit for reuse, such as
+        upgraded or streamed calls. The connection is closed on exit.
+        """
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            # Keep calls in order with those already queued
+            batch.flush()
+
+        with self._tunnel():
+            iface = self.connect()
+            try:
+                yield iface
+            except VarlinkError as e:
+                raise error_factory(e)
+            finally:
+                self._close_iface(iface)
+
+    @contextlib.contextmanager
+    def _tunnel(self):
+        """Context keeping transport to podman service available."""
+        yield None
+
+    def _open_via(self, tunnel):  # pylint: disable=unused-argument
+        """Open connection to podman service through tunnel."""
+        return self.open()
+
+    def open(self):
+        """Open connection to podman service.
+
+        The connection is kept alive and reused by the calling thread
+        until discard() or close() is called.
+        """
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            # Keep calls in order with those already queued
+            batch.flush()
+
+        ident = threading.get_ident()
+        # Fast path, only this thread stores its own entry
+        iface = self._ifaces.get(ident)
+        if iface is not None:
+            return iface
+
+        with self._lock:
+            iface = self._ifaces.get(ident)
+            if iface is None:
+                iface = self._ifaces[ident] = self.connect()
+        return iface
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Queue calls made by this thread and send them in one round trip.
+
+        Only calls made within pipelined() are queued, any other call,
+        including those on dedicated() connections, sends the queued
+        calls first. Queued calls not yet sent are dropped if the
+        context raises.
+        """
+        batch = getattr(self._local, "batch", None)
+        if batch is not None:
+            yield batch
+            return
+
+        with self._tunnel() as tunnel:
+            batch = Batch(self._open_via(tunnel), discard=self.discard)
+            self._local.batch = batch
+            try:
+                yield batch
+                batch.close()
+            finally:
+                self._local.batch = None
+
+    @contextlib.contextmanager
+    def pipelined(self):
+        """Context for calls that may be queued in an active batch."""
+        batch = getattr(self._local, "batch", None)
+        if batch is None:
+            with self as podman:
+                yield podman
+        else:
+            yield batch
+
+    def discard(self):
+        """Drop the calling thread's connection, next open() reconnects."""
+        with self._lock:
+            iface = self._ifaces.pop(threading.get_ident(), None)
+        if iface is not None:
+            self._close_iface(iface)
+
+    def prune(self):
+        """Close connections kept for threads which have exited."""
+        alive = {thread.ident for thread in threading.enumerate()}
+        with self._lock:
+            stale = [i for i in self._ifaces if i not in alive]
+            ifaces = [self._ifaces.pop(i) for i in stale]
+
+        for iface in ifaces:
+            self._close_iface(iface)
 
     def close(self):
-        """Close connection to podman service."""
-        if hasattr(self._client, "close"):
-            self._client.close()  # pylint: disable=no-member
-        self._iface.close()
+        """Close all connections to podman service."""
+        with self._lock:
+            ifaces = list(self._ifaces.values())
+            self._ifaces.clear()
+            client, self._client = self._client, None
+
+        for iface in ifaces:
+            self._close_iface(iface)
+        if hasattr(client, "close"):
+            client.close()  # pylint: disable=no-member
+
+    def _close_iface(self, iface):
+        iface.close()
         logging.debug(
             "%s closed varlink connection %s",
             type(self).__name__,
-            str(self._iface),
+            str(iface),
         )
 
+    def _exit(self, e):
+        """Handle exception raised while using a connection."""
+        if e is None:
+            return
+        if isinstance(e, VarlinkError):
+            raise error_factory(e)
+        # State of the connection is unknown, do not reuse it
+        self.discard()
+
 
 class LocalClient(BaseClient):
     """Context manager for API workers to access varlink."""
@@ -134,39 +276,70 @@ class LocalClient(BaseClient):
 
     def __exit__(self, e_type, e, e_traceback):
         """Cleanup context for LocalClient."""
-        self.close()
-        if isinstance(e, VarlinkError):
-            raise error_factory(e)
+        self._exit(e)
 
 
 class RemoteClient(BaseClient):
     """Context manager for API workers to access remote varlink."""
 
-    def __init__(self, context):
+    def __init__(self, context, list_ttl=0):
         """Construct RemoteCLient."""
-        super().__init__(context)
-        self._portal = Portal()
+        super().__init__(context, list_ttl)
+        self._portal = shared_portal()
+        # Tunnel each connection was opened through
+        self._via = weakref.WeakKeyDictionary()
 
     def __enter__(self):
         """Context manager for API workers to access varlink."""
-        tunnel = self._portal.get(self._context.uri)
-        if tunnel is None:
-            tunnel = Tunnel(self._context).bore()
-            self._portal[self._context.uri] = tunnel
-
+        tunnel = self._portal.acquire(self._context.uri)
         try:
-            return self.open()
+            if tunnel is None:
+                tunnel = self._bore()
+            return self._open_via(tunnel)
         except Exception:
-            tunnel.close()
+            self._portal.release(self._context.uri)
             raise
 
+    @contextlib.contextmanager
+    def _tunnel(self):
+        """Context holding ssh tunnel, bored when there is none."""
+        tunnel = self._portal.acquire(self._context.uri)
+        try:
+            if tunnel is None:
+                tunnel = self._bore()
+            yield tunnel
+        finally:
+            self._portal.release(self._context.uri)
+
+    def _open_via(self, tunnel):
+        """Open connection, reconnecting if made through another tunnel."""
+        iface = self._ifaces.get(threading.get_ident())
+        if iface is not None:
+            with self._lock:
+                via = self._via.get(iface)
+            if via is not tunnel:
+                # Connection made through a previous tunnel is stale
+                self.discard()
+
+        iface = self.open()
+        with self._lock:
+            self._via.setdefault(iface, tunnel)
+        return iface
+
+    def _bore(self):
+        """Return tunnel for uri, boring it unless another thread did."""
+        with self._portal.bore_lock(self._context.uri):
+            tunnel = self._portal.get(self._context.uri)
+            if tunnel is None:
+                tunnel = Tunnel(self._context).bore()
+                self._portal[self._context.uri] = tunnel
+        return tunnel
+
     def __exit__(self, e_type, e, e_traceback):
         """Cleanup context for RemoteClient."""
-        self.close()
-        # set timer to shutdown ssh tunnel
-        # self._portal.get(self._context.uri).close()
-        if isinstance(e, VarlinkError):
-            raise error_factory(e)
+        # Portal shuts down ssh tunnel once no client has used it for a while
+        self._portal.release(self._context.uri)
+        self._exit(e)
 
 
 class Client:
@@ -187,15 +360,21 @@ class Client:
     """
 
     def __init__(
-        self, uri="unix:/run/podman/io.podman", interface="io.podman", **kwargs
+        self,
+        uri="unix:/run/podman/io.podman",
+        interface="io.podman",
+        list_ttl=0,
+        **kwargs
     ):
         """Construct a podman varlink Client.
 
         uri from default systemd unit file.
         interface from io.podman.varlink, do not change unless
             you are a varlink guru.
+        list_ttl, seconds container listings are reused unless changed
+            through this client. 0, the default, always asks the service.
         """
-        self._client = BaseClient.factory(uri, interface, **kwargs)
+        self._client = BaseClient.factory(uri, interface, list_ttl, **kwargs)
 
         address = "{}-{}".format(uri, interface)
         # Quick validation of connection data provided
@@ -219,8 +398,28 @@ class Client:
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        """Raise any exception triggered within the runtime context."""
-        return
+        """Close connections and raise any exception from the context."""
+        self.close()
+
+    def close(self):
+        """Close all connections to podman service."""
+        self._client.close()
+
+    def batch(self):
+        """Send container operations made in context in one round trip.
+
+        Example:
+
+            >>> with client.batch():
+            ...     removed = ctnr.remove(force=True)
+            ...     ctnrs = list(client.containers.list())
+            >>> removed.result()
+
+        Container and Containers methods that can be queued return
+        podman.libs.batch.Deferred placeholders, use result() to obtain
+        the reply.
+        """
+        return self._client.batch()
 
     @cached_property
     def system(self):
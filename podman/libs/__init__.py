@@ -2,15 +2,24 @@
 import collections
 import datetime
 import functools
+import json
 
 from dateutil.parser import parse as dateutil_parse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 __all__ = [
     'cached_property',
     'datetime_format',
     'datetime_parse',
     'flatten',
     'fold_keys',
+    'fold_keys_inplace',
+    'loads_folded',
+    'tuple_type',
 ]
 
 
@@ -19,12 +28,25 @@ def cached_property(fn):
     return property(functools.lru_cache(maxsize=8)(fn))
 
 
-class ConfigDict(collections.UserDict):
-    """Silently ignore None values, only take key once."""
+@functools.lru_cache(maxsize=64)
+def tuple_type(name, fields):
+    """Return namedtuple type, built once for each name and fields."""
+    return collections.namedtuple(name, fields)
+
+
+class ConfigDict(dict):
+    """Silently ignore None values, only take key once.
+
+    Only __setitem__(), update() and setdefault() are guarded, copy() and
+    the | operators return plain dictionaries.
+    """
+
+    __slots__ = ()
 
     def __init__(self, **kwargs):
         """Construct dictionary."""
-        super().__init__(kwargs)
+        super().__init__()
+        self.update(kwargs)
 
     def __setitem__(self, key, value):
         """Store unique, not None values."""
@@ -36,6 +58,16 @@ class ConfigDict(collections.UserDict):
 
         super().__setitem__(key, value)
 
+    def update(self, *args, **kwargs):
+        """Store unique, not None values from mapping and kwargs."""
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        """Store default if unique and not None, return value of key."""
+        self[key] = default
+        return self.get(key)
+
 
 class FoldedString(collections.UserString):
     """Foldcase sequences value."""
@@ -45,15 +77,45 @@ class FoldedString(collections.UserString):
         self.data.casefold()
 
 
-def fold_keys():  # noqa: D202
+def _fold_keys(mapping):
     """Fold case of dictionary keys."""
+    return {k.casefold(): v for (k, v) in mapping.items()}
+
+
+def fold_keys():
+    """Return json object_hook to fold case of dictionary keys."""
+    return _fold_keys
+
 
-    @functools.wraps(fold_keys)
-    def wrapped(mapping):
-        """Fold case of dictionary keys."""
-        return {k.casefold(): v for (k, v) in mapping.items()}
+def fold_keys_inplace(obj):
+    """Fold case of dictionary keys found anywhere in obj, return obj."""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            keys = list(item)
+            folded = [k.casefold() for k in keys]
+            if folded != keys:
+                # Rebuild in place, keys keep their order
+                values = list(item.values())
+                item.clear()
+                item.update(zip(folded, values))
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+    return obj
 
-    return wrapped
+
+def loads_folded(string):
+    """Parse JSON string, folding case of dictionary keys.
+
+    orjson is used when installed.
+    """
+    if orjson is None:
+        # The C scanner calls object_hook cheaper than a second walk
+        #  over the parsed tree, keep the hook for the stdlib parser
+        return json.loads(string, object_hook=_fold_keys)
+    return fold_keys_inplace(orjson.loads(string))
 
 
 def datetime_parse(string):
@@ -7,10 +7,15 @@ import struct
 import sys
 import termios
 
+PseudoTTY = collections.namedtuple(
+    'PseudoTTY', ['stdin', 'stdout', 'io_socket', 'control_socket', 'eot'])
+
 
 class Mixin:
     """Publish attach() for inclusion in Container class."""
 
+    __slots__ = ()
+
     def attach(self, eot=4, stdin=None, stdout=None):
         """Attach to container's PID1 stdin and stdout.
 
@@ -39,15 +44,13 @@ class Mixin:
 
         # This is the control socket where resizing events are sent to conmon
         # attach['sockets']['control_socket']
-        self.pseudo_tty = collections.namedtuple(
-            'PseudoTTY',
-            ['stdin', 'stdout', 'io_socket', 'control_socket', 'eot'])(
-                stdin,
-                stdout,
-                attach['sockets']['io_socket'],
-                attach['sockets']['control_socket'],
-                eot,
-            )
+        self.pseudo_tty = PseudoTTY(
+            stdin,
+            stdout,
+            attach['sockets']['io_socket'],
+            attach['sockets']['control_socket'],
+            eot,
+        )
 
     @property
     def resize_handler(self):
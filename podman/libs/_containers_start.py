@@ -8,25 +8,33 @@ import sys
 import termios
 import tty
 
+from .batch import resolve
+
 CONMON_BUFSZ = 8192
 
 
 class Mixin:
     """Publish start() for inclusion in Container class."""
 
-    def start(self):
+    __slots__ = ()
+
+    def start(self, refresh=True):
         """Start container, return container on success.
 
         Will block if container has been detached.
+        refresh=False, skip fetching new state. See refresh_after().
         """
-        with self._client() as podman:
+        with self._client().pipelined() as podman:
             logging.debug('Starting Container "%s"', self._id)
+            self._client().listings.clear()
             results = podman.StartContainer(self._id)
             logging.debug('Started Container "%s"', results['container'])
 
             if not hasattr(self, 'pseudo_tty') or self.pseudo_tty is None:
-                return self._refresh(podman)
+                return self._changed(podman, refresh)
 
+            # Container must be started before attaching, send any batch
+            results = resolve(results)
             logging.debug('Setting up PseudoTTY for Container "%s"',
                           results['container'])
 
@@ -79,4 +87,4 @@ class Mixin:
                     termios.tcsetattr(self.pseudo_tty.stdin, termios.TCSADRAIN,
                                       tcoldattr)
                     signal.signal(signal.SIGWINCH, signal.SIG_DFL)
-            return self._refresh(podman)
+            return self._changed(podman, refresh)
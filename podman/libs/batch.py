@@ -0,0 +1,170 @@
+"""Pipeline varlink calls over a single connection."""
+import json
+
+from varlink import VarlinkEncoder, VarlinkError
+
+from .errors import error_factory
+
+__all__ = ['Batch', 'Deferred', 'resolve']
+
+
+class Deferred:
+    """Placeholder for the reply of a batched call.
+
+    Indexing a Deferred returns a Deferred for that item of the reply,
+    result() or iterating sends the batch if the reply is not in yet.
+    """
+
+    def __init__(self, batch, source=None, key=None):
+        """Construct placeholder for reply, or an item of source reply."""
+        self._batch = batch
+        self._source = source
+        self._key = key
+        self._done = False
+        self._value = None
+        self._error = None
+        self.retrieved = False
+
+    def _set(self, value=None, error=None):
+        self._value = value
+        self._error = error
+        self._done = True
+
+    @property
+    def done(self):
+        """Has reply been received."""
+        if self._source is not None:
+            return self._source.done
+        return self._done
+
+    def result(self):
+        """Return reply of call, raise error if the call failed."""
+        if self._source is not None:
+            return self._source.result()[self._key]
+
+        if not self._done:
+            self._batch.flush()
+        self.retrieved = True
+
+        if isinstance(self._error, VarlinkError):
+            raise error_factory(self._error)
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def __getitem__(self, key):
+        """Return placeholder for item of reply."""
+        return Deferred(self._batch, self, key)
+
+    def __iter__(self):
+        """Iterate reply."""
+        return iter(self.result())
+
+    def __repr__(self):
+        """Show placeholder and, when available, reply or error.
+
+        Does not count as retrieving the reply, see Batch.close().
+        """
+        if not self.done:
+            return '<Deferred pending>'
+        if self._source is not None:
+            return '<Deferred {!r}[{!r}]>'.format(self._source, self._key)
+        if self._error is not None:
+            return '<Deferred error {!r}>'.format(self._error)
+        return '<Deferred {!r}>'.format(self._value)
+
+
+class Batch:
+    """Queue varlink calls, then send them together in one round trip.
+
+    Replies are read back in the order the calls were queued.
+    """
+
+    def __init__(self, iface, discard=None):
+        """Construct batch on top of given varlink interface.
+
+        discard is called when a failed flush leaves replies unread on
+        the connection.
+        """
+        self._iface = iface
+        self._discard = discard
+        self._pending = []
+        self._calls = []
+
+    def __getattr__(self, method):
+        """Return callable queueing varlink method."""
+        if method.startswith('_'):
+            raise AttributeError(method)
+
+        def wrapped(*args, **kwargs):
+            return self.call(method, *args, **kwargs)
+
+        return wrapped
+
+    def call(self, method, *args, **kwargs):
+        """Queue varlink method, return Deferred reply."""
+        # pylint: disable=protected-access
+        interface = self._iface._interface
+        signature = interface.get_method(method)
+        parameters = interface.filter_params('client.call',
+                                             signature.in_type, False, args,
+                                             kwargs)
+        out = {'method': '{}.{}'.format(interface.name, method)}
+        if parameters:
+            out['parameters'] = parameters
+
+        reply = Deferred(self)
+        self._pending.append((json.dumps(out, cls=VarlinkEncoder).encode(
+            'utf-8'), signature, reply))
+        self._calls.append(reply)
+        return reply
+
+    def flush(self):
+        """Send queued calls and collect their replies."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        # pylint: disable=protected-access
+        interface = self._iface._interface
+        try:
+            # One write for the whole batch, varlink messages are
+            #  separated by a NUL byte
+            self._iface._send_message(b'\0'.join(m for m, _, _ in pending))
+
+            for _, signature, reply in pending:
+                try:
+                    message, _ = self._iface._next_varlink_message()
+                except VarlinkError as e:
+                    reply._set(error=e)
+                    continue
+
+                if message:
+                    message = interface.filter_params(
+                        'client.reply', signature.out_type, False, message,
+                        None)
+                reply._set(value=message)
+        except BaseException as e:
+            for _, _, reply in pending:
+                if not reply.done:
+                    reply._set(error=e)
+            # Replies still in flight would be read by the next call
+            if self._discard is not None:
+                self._discard()
+            raise
+
+    def close(self):
+        """Flush batch, raise first error not already retrieved."""
+        self.flush()
+        calls, self._calls = self._calls, []
+        # pylint: disable=protected-access
+        for reply in calls:
+            if not reply.retrieved and reply._error is not None:
+                reply.result()
+
+
+def resolve(value):
+    """Return reply for value, whether batched or not."""
+    if isinstance(value, Deferred):
+        return value.result()
+    return value
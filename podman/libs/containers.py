@@ -1,71 +1,210 @@
 """Models for manipulating containers and storage."""
-import collections
+import collections.abc
+import concurrent.futures
+import functools
 import getpass
-import json
 import logging
 import signal
+import socket
 import time
 
-from . import fold_keys
+from varlink import VarlinkError
+
+from . import loads_folded, tuple_type
+from .batch import Batch, resolve
 from ._containers_attach import Mixin as AttachMixin
 from ._containers_start import Mixin as StartMixin
 
 
-class Container(AttachMixin, StartMixin, collections.UserDict):
+def _memoize(fn):
+    """Cache result on container until it is refreshed or changed."""
+
+    @functools.wraps(fn)
+    def wrapped(self, *args, **kwargs):
+        key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            return self._inspect_cache[key]
+        except KeyError:
+            value = self._inspect_cache[key] = fn(self, *args, **kwargs)
+            return value
+
+    return wrapped
+
+
+@functools.lru_cache(maxsize=1)
+def _default_author():
+    """Return user name, looked up once."""
+    return getpass.getuser()
+
+
+def _cached(client, key):
+    """Return value stored with key in client's listings, or None."""
+    cached = client.listings.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    return None
+
+
+def _cache(client, key, value):
+    """Store value in client's listings for list_ttl seconds.
+
+    Expired entries are dropped, keeping listings to those still in use.
+    """
+    if not client.list_ttl:
+        return
+
+    now = time.monotonic()
+    listings = client.listings
+    for old, (_, expires) in list(listings.items()):
+        if expires <= now:
+            listings.pop(old, None)
+    listings[key] = (value, now + client.list_ttl)
+
+
+def _stream(client, method, key, *args):
+    """Yield items of key from each reply of method as they arrive.
+
+    Uses its own connection, closed when the generator is exhausted or
+    closed. Services replying only once are handled the same way.
+    """
+    with client().dedicated() as podman:
+        for reply in getattr(podman, method)(*args, _more=True):
+            yield from reply[key]
+
+
+class Container(AttachMixin, StartMixin, collections.abc.MutableMapping):
     """Model for a container."""
 
-    def __init__(self, client, ident, data, refresh=True):
-        """Construct Container Model."""
-        super(Container, self).__init__(data)
+    __slots__ = ('_client', '_id', 'data', '_inspect_cache', 'pseudo_tty')
+
+    def __init__(self, client, ident, data, refresh=True, _trusted=False):
+        """Construct Container Model.
+
+        data is used as is, not copied.
+        """
+        if not _trusted:
+            assert ident == data['id'],\
+                'Requested container id({}) does not match store id({})'.\
+                format(ident, data['id'])
+
+        self.data = data
         self._client = client
         self._id = ident
+        self._inspect_cache = {}
 
         if refresh:
             with client() as podman:
                 self._refresh(podman)
-        else:
-            for k, v in self.data.items():
-                setattr(self, k, v)
-            if 'containerrunning' in self.data:
-                setattr(self, 'running', self.data['containerrunning'])
-                self.data['running'] = self.data['containerrunning']
-
-        assert self._id == data['id'],\
-            'Requested container id({}) does not match store id({})'.format(
-                self._id, data['id']
-            )
-
-    def _refresh(self, podman, tries=1):
-        try:
-            ctnr = podman.GetContainer(self._id)
-        except BrokenPipeError:
-            logging.debug('Failed GetContainer(%s) try %d/3', self._id, tries)
-            if tries > 3:
-                raise
-            else:
-                with self._client() as pman:
-                    self._refresh(pman, tries + 1)
-        else:
-            super().update(ctnr['container'])
+        elif 'containerrunning' in self.data:
+            self.data['running'] = self.data['containerrunning']
 
-            for k, v in self.data.items():
-                setattr(self, k, v)
-            if 'containerrunning' in self.data:
-                setattr(self, 'running', self.data['containerrunning'])
-                self.data['running'] = self.data['containerrunning']
+    def __getattr__(self, name):
+        """Return container field as attribute."""
+        if name == 'data':
+            raise AttributeError(name)
+        try:
+            return self.data[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __getitem__(self, key):
+        """Return container field."""
+        return self.data[key]
+
+    def __setitem__(self, key, value):
+        """Set container field."""
+        self.data[key] = value
+
+    def __delitem__(self, key):
+        """Remove container field."""
+        del self.data[key]
+
+    def __contains__(self, key):
+        """Is field in container."""
+        return key in self.data
+
+    def __iter__(self):
+        """Iterate container fields."""
+        return iter(self.data)
+
+    def __len__(self):
+        """Return number of container fields."""
+        return len(self.data)
+
+    def __repr__(self):
+        """Return representation of container fields."""
+        return repr(self.data)
+
+    def update(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        """Update container fields."""
+        self.data.update(*args, **kwargs)
+
+    def copy(self):
+        """Return new Container with a shallow copy of the fields."""
+        ctnr = Container(self._client, self._id, self.data.copy(),
+                         refresh=False, _trusted=True)
+        if hasattr(self, 'pseudo_tty'):
+            ctnr.pseudo_tty = self.pseudo_tty
+        return ctnr
+
+    def _refresh(self, podman, retries=3):
+        if not isinstance(podman, Batch):
+            # An earlier retry may have replaced the caller's connection
+            podman = self._client().open()
+
+        for tries in range(1, retries + 2):
+            try:
+                ctnr = resolve(podman.GetContainer(self._id))
+                break
+            except BrokenPipeError:
+                logging.debug('Failed GetContainer(%s) try %d/%d', self._id,
+                              tries, retries + 1)
+                if tries > retries:
+                    raise
+                time.sleep(0.05 * 2**tries)
+                # Replace broken connection, later calls reuse the new one
+                self._client().discard()
+                podman = self._client().open()
+
+        self.data.update(ctnr['container'])
+        self._inspect_cache.clear()
+
+        if 'containerrunning' in self.data:
+            self.data['running'] = self.data['containerrunning']
+
+        return self
+
+    def _changed(self, podman, refresh):
+        """Refresh container after change, or mark its state as unknown."""
+        if refresh:
+            return self._refresh(podman)
 
-            return self
+        self._inspect_cache.clear()
+        self.data['running'] = None
+        return self
 
     def refresh(self):
         """Refresh status fields for this container."""
         with self._client() as podman:
             return self._refresh(podman)
 
+    def refresh_after(self, *ops):
+        """Run ops then refresh container, all in one round trip.
+
+        Each op is called with refresh=False, for example:
+
+            >>> ctnr.refresh_after(ctnr.stop, ctnr.start)
+            >>> ctnr.refresh_after(functools.partial(ctnr.stop, timeout=5))
+        """
+        with self._client().batch() as podman:
+            for op in ops:
+                op(refresh=False)
+            return self._refresh(podman)
+
     def processes(self):
         """Show processes running in container."""
-        with self._client() as podman:
-            results = podman.ListContainerProcesses(self._id)
-        yield from results['container']
+        yield from _stream(self._client, 'ListContainerProcesses', 'container',
+                           self._id)
 
     def changes(self):
         """Retrieve container changes."""
@@ -80,24 +219,49 @@ class Container(AttachMixin, StartMixin, collections.UserDict):
         wait n of seconds, 0 waits forever.
         """
         with self._client() as podman:
+            self._client().listings.clear()
             podman.KillContainer(self._id, sig)
-            timeout = time.time() + wait
+
+            try:
+                self._wait_exit(wait)
+            except VarlinkError:
+                logging.debug('WaitContainer(%s) failed, polling status',
+                              self._id)
+            else:
+                return self._refresh(podman)
+
+            deadline = time.monotonic() + wait
             while True:
                 self._refresh(podman)
                 if self.status != 'running':  # pylint: disable=no-member
                     return self
 
-                if wait and timeout < time.time():
+                if wait and time.monotonic() > deadline:
                     raise TimeoutError()
 
                 time.sleep(0.5)
 
+    def _wait_exit(self, wait):
+        """Block in service until container exits, wait 0 waits forever."""
+        # Use own connection, a timeout leaves it in the middle of a call
+        with self._client().dedicated() as podman:
+            # pylint: disable=protected-access
+            podman._connection.settimeout(wait or None)
+            try:
+                podman.WaitContainer(self._id)
+            except socket.timeout:
+                raise TimeoutError()
+
+    @_memoize
     def inspect(self):
-        """Retrieve details about containers."""
+        """Retrieve details about containers.
+
+        Result is cached until the container is refreshed or changed.
+        """
         with self._client() as podman:
             results = podman.InspectContainer(self._id)
-        obj = json.loads(results['container'], object_hook=fold_keys())
-        return collections.namedtuple('ContainerInspect', obj.keys())(**obj)
+        obj = loads_folded(results['container'])
+        return tuple_type('ContainerInspect', tuple(obj.keys()))(**obj)
 
     def export(self, target):
         """Export container from store to tarball.
@@ -108,7 +272,8 @@ class Container(AttachMixin, StartMixin, collections.UserDict):
             results = podman.ExportContainer(self._id, target)
         return results['tarfile']
 
-    def commit(self, image_name, **kwargs):
+    def commit(self, image_name, *, author=None, change=(), message='',
+               pause=True):
         """Create image from container.
 
         Keyword arguments:
@@ -130,66 +295,87 @@ class Container(AttachMixin, StartMixin, collections.UserDict):
         All changes overwrite existing values.
           See inspect() to obtain current settings.
         """
-        author = kwargs.get('author', None) or getpass.getuser()
-        change = kwargs.get('change', None) or []
-        message = kwargs.get('message', None) or ''
-        pause = kwargs.get('pause', None) or True
+        author = author or _default_author()
+        change = change or ()
+        message = message or ''
 
         for c in change:
-            if c.startswith('LABEL=') and c.count('=') < 2:
+            # LABEL= must be followed by label=value
+            if c[:6] == 'LABEL=' and c.find('=', 6) == -1:
                 raise ValueError(
                     'LABEL should have the format: LABEL=label=value, not {}'.
                     format(c))
 
+        self._inspect_cache.clear()
         with self._client() as podman:
             results = podman.Commit(self._id, image_name, change, author,
                                     message, pause)
         return results['reply']['id']
 
-    def stop(self, timeout=25):
-        """Stop container, return id on success."""
-        with self._client() as podman:
+    def stop(self, timeout=25, refresh=True):
+        """Stop container, return id on success.
+
+        refresh=False, skip fetching new state. See refresh_after().
+        """
+        with self._client().pipelined() as podman:
+            self._client().listings.clear()
             podman.StopContainer(self._id, timeout)
-            return self._refresh(podman)
+            return self._changed(podman, refresh)
 
     def remove(self, force=False):
         """Remove container, return id on success.
 
         force=True, stop running container.
+        Within Client.batch() the id is returned as a Deferred.
         """
-        with self._client() as podman:
+        with self._client().pipelined() as podman:
+            self._client().listings.clear()
+            self._inspect_cache.clear()
             results = podman.RemoveContainer(self._id, force)
         return results['container']
 
-    def restart(self, timeout=25):
-        """Restart container with timeout, return id on success."""
-        with self._client() as podman:
+    def restart(self, timeout=25, refresh=True):
+        """Restart container with timeout, return id on success.
+
+        refresh=False, skip fetching new state. See refresh_after().
+        """
+        with self._client().pipelined() as podman:
+            self._client().listings.clear()
             podman.RestartContainer(self._id, timeout)
-            return self._refresh(podman)
+            return self._changed(podman, refresh)
 
-    def pause(self):
-        """Pause container, return id on success."""
-        with self._client() as podman:
+    def pause(self, refresh=True):
+        """Pause container, return id on success.
+
+        refresh=False, skip fetching new state. See refresh_after().
+        """
+        with self._client().pipelined() as podman:
+            self._client().listings.clear()
             podman.PauseContainer(self._id)
-            return self._refresh(podman)
+            return self._changed(podman, refresh)
 
-    def unpause(self):
-        """Unpause container, return id on success."""
-        with self._client() as podman:
+    def unpause(self, refresh=True):
+        """Unpause container, return id on success.
+
+        refresh=False, skip fetching new state. See refresh_after().
+        """
+        with self._client().pipelined() as podman:
+            self._client().listings.clear()
             podman.UnpauseContainer(self._id)
-            return self._refresh(podman)
+            return self._changed(podman, refresh)
 
-    def update_container(self, *args, **kwargs):  \
+    def update_container(self, *args, refresh=True, **kwargs):  \
             # pylint: disable=unused-argument
         """TODO: Update container..., return id on success."""
         with self._client() as podman:
             podman.UpdateContainer()
-            return self._refresh(podman)
+            return self._changed(podman, refresh)
 
     def wait(self):
         """Wait for container to finish, return 'returncode'."""
         with self._client() as podman:
             results = podman.WaitContainer(self._id)
+            self._inspect_cache.clear()
         return int(results['exitcode'])
 
     def stats(self):
@@ -197,13 +383,12 @@ class Container(AttachMixin, StartMixin, collections.UserDict):
         with self._client() as podman:
             results = podman.GetContainerStats(self._id)
         obj = results['container']
-        return collections.namedtuple('StatDetail', obj.keys())(**obj)
+        return tuple_type('StatDetail', tuple(obj.keys()))(**obj)
 
     def logs(self, *args, **kwargs):  # pylint: disable=unused-argument
         """Retrieve container logs."""
-        with self._client() as podman:
-            results = podman.GetContainerLogs(self._id)
-        yield from results['container']
+        yield from _stream(self._client, 'GetContainerLogs', 'container',
+                           self._id)
 
     def health_check_run(self):
         """Executes defined container's healthcheck command
@@ -223,7 +408,9 @@ class Container(AttachMixin, StartMixin, collections.UserDict):
     def init(self):
         """Initializes the container."""
         with self._client() as podman:
+            self._client().listings.clear()
             results = podman.InitContainer(self._id)
+            self._inspect_cache.clear()
         return results['container']
 
     def attach_control(self):
@@ -234,20 +421,24 @@ class Container(AttachMixin, StartMixin, collections.UserDict):
     def checkpoint(self, keep=True, leaveRunning=True, tcpEstablished=True):
         """performs a checkpopint on the container."""
         with self._client() as podman:
+            self._client().listings.clear()
             results = podman.ContainerCheckpoint(
                 self._id,
                 keep,
                 leaveRunning,
                 tcpEstablished)
+            self._inspect_cache.clear()
         return results['id']
 
     def restore(self, keep=True, tcpEstablished=True):
         """Restores a container that has been checkpointed."""
         with self._client() as podman:
+            self._client().listings.clear()
             results = podman.ContainerRestore(
                 self._id,
                 keep,
                 tcpEstablished)
+            self._inspect_cache.clear()
         return results['id']
 
     def run_label(self, runlabel):
@@ -264,31 +455,37 @@ class Container(AttachMixin, StartMixin, collections.UserDict):
         """Mounts the container."""
         with self._client() as podman:
             results = podman.MountContainer(self._id)
+            self._inspect_cache.clear()
         return results['path']
 
     def umount(self, force=False):
         """Mounts the container."""
         with self._client() as podman:
             podman.UnmountContainer(self._id, force)
+            self._inspect_cache.clear()
 
+    @_memoize
     def config(self):
         """Returns container's config in string form."""
         with self._client() as podman:
             results = podman.ContainerConfig(self._id)
         return results['config']
 
+    @_memoize
     def artifacts(self, artifactName):
         """Returns the container's artifacts in string form."""
         with self._client() as podman:
             results = podman.ContainerArtifacts(self._id, artifactName)
         return results['config']
 
+    @_memoize
     def inspect_data(self, size=True):
         """Returns the container's inspect data in string form."""
         with self._client() as podman:
             results = podman.ContainerInspectData(self._id, size)
         return results['config']
 
+    @_memoize
     def state_data(self):
         """Returns the container's state config in string form."""
         with self._client() as podman:
@@ -303,16 +500,81 @@ class Containers():
         """Construct model for Containers collection."""
         self._client = client
 
-    def list(self):
-        """List of containers in the container store."""
+    def list(self, lite=False):
+        """List of containers in the container store.
+
+        lite=True, use GetContainersByContext() which only returns the
+            ids of the containers. The containers hold no other fields,
+            use refresh() to fetch their details.
+
+        With Client(list_ttl=n) listings are reused for n seconds,
+        changes made through the client discard them.
+        """
+        key = ('containers', lite)
+        cached = _cached(self._client(), key)
+        if cached is not None:
+            # Containers own their data, do not share the cached copy
+            for cntr in cached:
+                yield Container(self._client, cntr['id'], dict(cntr),
+                                refresh=False, _trusted=True)
+            return
+
+        with self._client().pipelined() as podman:
+            if lite:
+                results = podman.GetContainersByContext(True, False, [])
+            else:
+                results = podman.ListContainers()
+        ctnrs = resolve(results['containers'])
+        if lite:
+            ctnrs = [{'id': id_} for id_ in ctnrs]
+        if self._client().list_ttl:
+            # Cache copies, containers yielded below change their data
+            _cache(self._client(), key, [dict(c) for c in ctnrs])
+
+        for cntr in ctnrs:
+            yield Container(self._client, cntr['id'], cntr, refresh=False,
+                            _trusted=True)
+
+    def list_parallel(self, max_workers=8):
+        """List of containers, each refreshed with full details.
+
+        Containers are fetched concurrently by max_workers threads,
+        each using its own connection.
+        """
         with self._client() as podman:
-            results = podman.ListContainers()
-        for cntr in results['containers']:
-            yield Container(self._client, cntr['id'], cntr, refresh=False)
+            results = podman.GetContainersByContext(True, False, [])
+
+        def get(id_):
+            return Container(self._client, id_, {'id': id_})
+
+        return self._fan_out(get, results['containers'], max_workers)
+
+    def remove_many(self, ids, force=False, max_workers=8):
+        """Remove containers concurrently, return list of removed ids.
+
+        force=True, stop running containers.
+        """
+        self._client().listings.clear()
+
+        def remove(id_):
+            with self._client() as podman:
+                return podman.RemoveContainer(id_, force)['container']
+
+        return self._fan_out(remove, ids, max_workers)
+
+    def _fan_out(self, fn, items, max_workers):
+        try:
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max_workers) as executor:
+                return list(executor.map(fn, items))
+        finally:
+            # Worker threads are gone, so are the users of their connections
+            self._client().prune()
 
     def delete_stopped(self):
         """Delete all stopped containers."""
         with self._client() as podman:
+            self._client().listings.clear()
             results = podman.DeleteStoppedContainers()
         return results['containers']
 
@@ -346,26 +608,27 @@ class Containers():
              tail=None,
              timestamps=True):
         """Get containers ids or names and returns the logs
-        of these containers"""
-        with self._client() as podman:
-            results = podman.GetContainersLogs(
-                names,
-                follow,
-                latest,
-                since,
-                tail,
-                timestamps
-            )
-        return results['log']
+        of these containers, yielded as they arrive"""
+        yield from _stream(self._client, 'GetContainersLogs', 'log', names,
+                           follow, latest, since, tail, timestamps)
 
     def exists(self, id_):
         """Returns a bool as to whether the container exists in
-        local storage."""
-        with self._client() as podman:
-            exist = podman.ContainerExists(id_)
-            if exist['exists'] == 0:
-                return True
-        return False
+        local storage.
+
+        Answers are reused for Client(list_ttl=n) seconds, like list().
+        """
+        key = ('exists', id_)
+        cached = _cached(self._client(), key)
+        if cached is not None:
+            return cached
+
+        with self._client().pipelined() as podman:
+            exist = resolve(podman.ContainerExists(id_))
+        # ContainerExists replies 0 when the container is found
+        found = exist['exists'] == 0
+        _cache(self._client(), key, found)
+        return found
 
     def list_mounts(self):
         """gathers all the mounted container mount points and returns
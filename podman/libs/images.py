@@ -1,16 +1,44 @@
 """Models for manipulating images in/to/from storage."""
 import collections
-import copy
-import io
-import json
 import logging
 import os
+import shutil
 import tarfile
 import tempfile
 
-from . import ConfigDict, flatten, fold_keys
+from . import ConfigDict, flatten, loads_folded, tuple_type
 from .containers import Container
 
+# Block size used to copy and send build context
+_BUFSIZE = 1 << 20
+# Build contexts larger than this are spooled to disk
+_SPOOL_SIZE = 64 << 20
+
+
+def _scandir_files(root):
+    """Yield path of every non-directory below root.
+
+    Symlinks are yielded, not followed.
+    """
+    dirs = [root]
+    while dirs:
+        # Entries carry their type from readdir, no stat call per entry
+        for entry in os.scandir(dirs.pop()):
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(entry.path)
+            else:
+                yield entry.path
+
+
+def _find_containerfile(root):
+    """Return name of Containerfile, or Dockerfile, in root."""
+    for name in ("Containerfile", "Dockerfile"):
+        if os.path.isfile(os.path.join(root, name)):
+            return name
+    raise ValueError(
+        '"context_directory" has no Containerfile or Dockerfile.'
+    )
+
 
 class Image(collections.UserDict):
     """Model for an Image."""
@@ -18,11 +46,10 @@ class Image(collections.UserDict):
     def __init__(self, client, id_, data):
         """Construct Image Model."""
         super().__init__(data)
-        for k, v in data.items():
-            setattr(self, k, v)
 
         self._id = id_
         self._client = client
+        self._inspected = None
 
         assert (
             self._id == data["id"]
@@ -30,11 +57,20 @@ class Image(collections.UserDict):
             self._id, data["id"]
         )
 
+    def __getattr__(self, name):
+        """Return image field as attribute."""
+        if name == "data":
+            raise AttributeError(name)
+        try:
+            return self.data[name]
+        except KeyError:
+            raise AttributeError(name)
+
     @staticmethod
     def _split_token(values=None, sep="="):
         if not values:
             return {}
-        return {k: v1 for k, v1 in (v0.split(sep, 1) for v0 in values)}
+        return {k: v for k, _, v in (v0.partition(sep) for v0 in values)}
 
     def create(self, **kwargs):
         """Create container from image.
@@ -46,8 +82,11 @@ class Image(collections.UserDict):
         config = ConfigDict(image_id=self._id, **kwargs)
         config["command"] = details.config.get("cmd")
         config["env"] = self._split_token(details.config.get("env"))
-        config["image"] = copy.deepcopy(details.repotags[0])
-        config["labels"] = copy.deepcopy(details.labels)
+        config["image"] = details.repotags[0]
+        # varlink rewrites mapping arguments in place, do not hand it the
+        #  labels of the cached inspect() result
+        if details.labels is not None:
+            config["labels"] = dict(details.labels)
         # TODO: Are these settings still required?
         config["net_mode"] = "bridge"
         config["network"] = "bridge"
@@ -59,9 +98,11 @@ class Image(collections.UserDict):
 
         logging.debug("Image %s: create config: %s", self._id, config)
         with self._client() as podman:
+            self._client().listings.clear()
             id_ = podman.CreateContainer(config)["container"]
             cntr = podman.GetContainer(id_)
-        return Container(self._client, id_, cntr["container"])
+        # Container state was just fetched, do not fetch it again
+        return Container(self._client, id_, cntr["container"], refresh=False)
 
     container = create
 
@@ -74,15 +115,21 @@ class Image(collections.UserDict):
     def history(self):
         """Retrieve image history."""
         with self._client() as podman:
-            for r in podman.HistoryImage(self._id)["history"]:
-                yield collections.namedtuple("HistoryDetail", r.keys())(**r)
+            results = podman.HistoryImage(self._id)
+        for r in results["history"]:
+            yield tuple_type("HistoryDetail", tuple(r))(**r)
 
     def inspect(self):
-        """Retrieve details about image."""
-        with self._client() as podman:
-            results = podman.InspectImage(self._id)
-        obj = json.loads(results["image"], object_hook=fold_keys())
-        return collections.namedtuple("ImageInspect", obj.keys())(**obj)
+        """Retrieve details about image.
+
+        Result is cached until the image is tagged or removed.
+        """
+        if self._inspected is None:
+            with self._client() as podman:
+                results = podman.InspectImage(self._id)
+            obj = loads_folded(results["image"])
+            self._inspected = tuple_type("ImageInspect", tuple(obj))(**obj)
+        return self._inspected
 
     def push(
         self,
@@ -109,12 +156,15 @@ class Image(collections.UserDict):
 
         force=True, stop any running containers using image.
         """
+        self._inspected = None
         with self._client() as podman:
+            self._client().listings.clear()
             results = podman.RemoveImage(self._id, force)
         return results["image"]
 
     def tag(self, tag):
         """Tag image."""
+        self._inspected = None
         with self._client() as podman:
             results = podman.TagImage(self._id, tag)
         return results["image"]
@@ -142,10 +192,16 @@ class Images:
             yield Image(self._client, img["id"], img)
 
     def build(
-        self, context_directory=None, containerfiles=None, tags=None, **kwargs
+        self,
+        context_directory=None,
+        containerfiles=None,
+        tags=None,
+        compress=False,
+        **kwargs
     ):
         """Build container from image.
 
+        compress=True, gzip build context before sending it.
         See podman-build.1.md for kwargs details.
         """
         if not (containerfiles or context_directory):
@@ -161,16 +217,18 @@ class Images:
         else:
             context_directory = os.getcwd()
 
-        if not containerfiles:
-            containerfiles = []
-            for entry in os.walk(context_directory):
-                containerfiles.append(entry)
-
         if containerfiles and not isinstance(containerfiles, (list, tuple)):
             raise ValueError(
                 '"containerfiles" is required to be a list or tuple.'
             )
 
+        if containerfiles:
+            members = containerfiles
+        else:
+            # Send whole context, build the Containerfile found in it
+            members = list(_scandir_files(context_directory))
+            containerfiles = [_find_containerfile(context_directory)]
+
         if not tags:
             raise ValueError('"tags" is a required argument.')
         if not isinstance(tags, (list, tuple)):
@@ -180,21 +238,36 @@ class Images:
             dockerfiles=containerfiles, tags=tags[1:], output=tags[0], **kwargs
         )
 
-        with io.BytesIO() as stream:
-            # Compile build context in memory tar file
-            with tarfile.open(mode="w:gz", fileobj=stream) as tar:
-                for name in containerfiles:
-                    tar.addfile(tar.gettarinfo(fileobj=open(name)))
-
-            if logging.getLogger().getEffectiveLevel() == logging.DEBUG:
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE) as stream:
+            # Compile build context tar file, in memory until it grows
+            #  past _SPOOL_SIZE
+            if compress:
+                # Fastest level, most of the time goes to sending context
+                options = {"mode": "w:gz", "compresslevel": 1}
+            else:
+                options = {"mode": "w"}
+            with tarfile.open(fileobj=stream, **options) as tar:
+                for name in members:
+                    tar.add(
+                        name,
+                        arcname=os.path.relpath(name, context_directory),
+                        recursive=False,
+                    )
+            length = stream.tell()
+
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
                 # If debugging save a copy of the tar file we're going
                 #  to send to service
-                tar = os.path.join(tempfile.gettempdir(), "buildContext.tgz")
+                tar = os.path.join(
+                    tempfile.gettempdir(),
+                    "buildContext.tgz" if compress else "buildContext.tar",
+                )
                 with open(tar, "wb") as file:
-                    file.write(stream.getvalue())
+                    stream.seek(0)
+                    shutil.copyfileobj(stream, file, _BUFSIZE)
 
-            with self._client() as podman:
-                length = stream.seek(0, io.SEEK_END)
+            # SendFile upgrades the connection, do not use a shared one
+            with self._client().dedicated() as podman:
                 remote_location = podman.SendFile("", length, _upgrade=True)
 
                 logging.debug(
@@ -202,21 +275,22 @@ class Images:
                 )
                 # TODO: When available use the convenience routines
                 # pylint: disable=protected-access
-                podman._connection.send(stream.getvalue())
+                stream.seek(0)
+                for chunk in iter(lambda: stream.read(_BUFSIZE), b""):
+                    podman._connection.sendall(chunk)
 
         config["contextDir"] = remote_location["file_handle"]
-        clnt = self._client().open()
-        output = clnt.BuildImage(build=config, _more=True)
 
         def wrapper():
             v = None
-            for v in output:
-                if not v["image"]["logs"]:
-                    break
-                yield v["image"]["logs"], None
+            # Replies stream in as the build runs, use own connection
+            with self._client().dedicated() as podman:
+                for v in podman.BuildImage(build=config, _more=True):
+                    if not v["image"]["logs"]:
+                        break
+                    yield v["image"]["logs"], None
             if v:
                 yield None, self.get(v["image"]["id"])
-            clnt.close()
 
         return wrapper
 
@@ -259,7 +333,7 @@ class Images:
         with self._client() as podman:
             results = podman.SearchImages(id_, limit, constraints)
         for img in results["results"]:
-            yield collections.namedtuple("ImageSearch", img.keys())(**img)
+            yield tuple_type("ImageSearch", tuple(img))(**img)
 
     def get(self, id_):
         """Get Image from id."""
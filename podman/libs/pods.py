@@ -1,40 +1,57 @@
 """Model for accessing details of Pods from podman service."""
 import collections
-import json
 import signal
 import time
 
-from . import ConfigDict, FoldedString, fold_keys
+from . import ConfigDict, FoldedString, loads_folded, tuple_type
+from .batch import resolve
 
 
 class Pod(collections.UserDict):
     """Model for a Pod."""
 
-    def __init__(self, client, ident, data):
-        """Construct Pod model."""
+    def __init__(self, client, ident, data, refresh=True):
+        """Construct Pod model.
+
+        refresh=False, data is current, skip fetching pod state.
+        """
         super().__init__(data)
 
         self._ident = ident
         self._client = client
 
-        with client() as podman:
-            self._refresh(podman)
+        if refresh:
+            with client() as podman:
+                self._refresh(podman)
+
+    def __getattr__(self, name):
+        """Return pod field as attribute."""
+        if name == 'data':
+            raise AttributeError(name)
+        try:
+            return self.data[name]
+        except KeyError:
+            raise AttributeError(name)
 
     def _refresh(self, podman):
-        pod = podman.GetPod(self._ident)
+        pod = resolve(podman.GetPod(self._ident))
         super().update(pod['pod'])
-
-        for k, v in self.data.items():
-            setattr(self, k, v)
         return self
 
+    def _act(self, method):
+        """Call pod action, fetch new state in the same round trip."""
+        with self._client().batch() as podman:
+            self._client().listings.clear()
+            getattr(podman, method)(self._ident)
+            return self._refresh(podman)
+
     def inspect(self):
         """Retrieve details about pod."""
         with self._client() as podman:
             results = podman.InspectPod(self._ident)
-        obj = json.loads(results['pod'], object_hook=fold_keys())
+        obj = loads_folded(results['pod'])
         obj['id'] = obj['config']['id']
-        return collections.namedtuple('PodInspect', obj.keys())(**obj)
+        return tuple_type('PodInspect', tuple(obj))(**obj)
 
     def kill(self, signal_=signal.SIGTERM, wait=25):
         """Send signal to all containers in pod.
@@ -43,8 +60,10 @@ class Pod(collections.UserDict):
         wait n of seconds, 0 waits forever.
         """
         with self._client() as podman:
+            self._client().listings.clear()
             podman.KillPod(self._ident, signal_)
-            timeout = time.time() + wait
+            deadline = time.monotonic() + wait
+            delay = 0.05
             while True:
                 # pylint: disable=maybe-no-member
                 self._refresh(podman)
@@ -52,17 +71,16 @@ class Pod(collections.UserDict):
                 if running != 'running':
                     break
 
-                if wait and timeout < time.time():
+                if wait and time.monotonic() >= deadline:
                     raise TimeoutError()
 
-                time.sleep(0.5)
+                time.sleep(delay)
+                delay = min(1.0, delay * 1.5)
         return self
 
     def pause(self):
         """Pause all containers in the pod."""
-        with self._client() as podman:
-            podman.PausePod(self._ident)
-            return self._refresh(podman)
+        return self._act('PausePod')
 
     def refresh(self):
         """Refresh status fields for this pod."""
@@ -75,33 +93,28 @@ class Pod(collections.UserDict):
         force=True, stop any running container.
         """
         with self._client() as podman:
+            self._client().listings.clear()
             results = podman.RemovePod(self._ident, force)
         return results['pod']
 
     def restart(self):
         """Restart all containers in the pod."""
-        with self._client() as podman:
-            podman.RestartPod(self._ident)
-            return self._refresh(podman)
+        return self._act('RestartPod')
 
     def stats(self):
         """Stats on all containers in the pod."""
         with self._client() as podman:
             results = podman.GetPodStats(self._ident)
         for obj in results['containers']:
-            yield collections.namedtuple('ContainerStats', obj.keys())(**obj)
+            yield tuple_type('ContainerStats', tuple(obj))(**obj)
 
     def start(self):
         """Start all containers in the pod."""
-        with self._client() as podman:
-            podman.StartPod(self._ident)
-            return self._refresh(podman)
+        return self._act('StartPod')
 
     def stop(self):
         """Stop all containers in the pod."""
-        with self._client() as podman:
-            podman.StopPod(self._ident)
-            return self._refresh(podman)
+        return self._act('StopPod')
 
     def top(self):
         """Display stats for all containers."""
@@ -111,9 +124,7 @@ class Pod(collections.UserDict):
 
     def unpause(self):
         """Unpause all containers in the pod."""
-        with self._client() as podman:
-            podman.UnpausePod(self._ident)
-            return self._refresh(podman)
+        return self._act('UnpausePod')
 
     def generate_kub(self, service=True):
         """Generates a Kubernetes v1 Pod description of a Podman container"""
@@ -151,22 +162,24 @@ class Pods():
         )
 
         with self._client() as podman:
+            self._client().listings.clear()
             result = podman.CreatePod(config)
             details = podman.GetPod(result['pod'])
-        return Pod(self._client, result['pod'], details['pod'])
+        return Pod(self._client, result['pod'], details['pod'], refresh=False)
 
     def get(self, ident):
         """Get Pod from ident."""
         with self._client() as podman:
             result = podman.GetPod(ident)
-        return Pod(self._client, result['pod']['id'], result['pod'])
+        return Pod(
+            self._client, result['pod']['id'], result['pod'], refresh=False)
 
     def list(self):
         """List all pods."""
         with self._client() as podman:
             results = podman.ListPods()
         for pod in results['pods']:
-            yield Pod(self._client, pod['id'], pod)
+            yield Pod(self._client, pod['id'], pod, refresh=False)
 
     def get_by_status(self, statuses):
         """Get pods by statuses"""
@@ -180,4 +193,4 @@ class Pods():
         with self._client() as podman:
             results = podman.GetPodsByContext(all, latest, args)
         for pod in results['pods']:
-            yield Pod(self._client, pod['id'], pod)
+            yield Pod(self._client, pod['id'], pod, refresh=False)
@@ -1,9 +1,13 @@
 """Models for accessing details from varlink server."""
-import collections
+try:
+    from importlib.metadata import version as _pkg_version
+except ImportError:
+    try:
+        from importlib_metadata import version as _pkg_version
+    except ImportError:
+        _pkg_version = None
 
-import pkg_resources
-
-from . import cached_property
+from . import cached_property, tuple_type
 
 
 class System():
@@ -20,18 +24,19 @@ class System():
             vers = podman.GetVersion()
 
         client = '0.0.0'
-        try:
-            client = pkg_resources.get_distribution('podman').version
-        except Exception:  # pylint: disable=broad-except
-            pass
+        if _pkg_version is not None:
+            try:
+                client = _pkg_version('podman')
+            except Exception:  # pylint: disable=broad-except
+                pass
         vers['client_version'] = client
-        return collections.namedtuple('Version', vers.keys())(**vers)
+        return tuple_type('Version', tuple(vers))(**vers)
 
     def info(self):
         """Return podman info."""
         with self._client() as podman:
             info = podman.GetInfo()['info']
-        return collections.namedtuple('Info', info.keys())(**info)
+        return tuple_type('Info', tuple(info))(**info)
 
     def ping(self):
         """Return True if server awake."""
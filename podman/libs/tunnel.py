@@ -29,12 +29,20 @@ Context.__new__.__defaults__ = (None, ) * len(Context._fields)
 class Portal(collections.MutableMapping):
     """Expiring container for tunnels."""
 
-    def __init__(self, sweap=25):
-        """Construct portal, reap tunnels every sweap seconds."""
+    def __init__(self, sweap=25, idle=30):
+        """Construct portal, reap tunnels every sweap seconds.
+
+        Released tunnels are closed by the first sweep idle seconds
+        after their last user left.
+        """
         self.data = collections.OrderedDict()
         self.sweap = sweap
         self.ttl = sweap * 2
+        self.idle = idle
         self.lock = threading.RLock()
+        self._users = collections.Counter()
+        self._released = {}
+        self._bore_locks = {}
         self._schedule_reaper()
 
     def __getitem__(self, key):
@@ -75,6 +83,27 @@ class Portal(collections.MutableMapping):
         with self.lock:
             return len(self.data)
 
+    def acquire(self, key):
+        """Count a user of tunnel keyed with uri, return tunnel or None."""
+        with self.lock:
+            self._users[key] += 1
+            self._released.pop(key, None)
+            return self.get(key)
+
+    def bore_lock(self, key):
+        """Return lock held while boring the tunnel keyed with uri."""
+        with self.lock:
+            return self._bore_locks.setdefault(key, threading.Lock())
+
+    def release(self, key):
+        """Drop a user of tunnel, reap() closes tunnel once idle."""
+        with self.lock:
+            self._users[key] -= 1
+            if self._users[key] > 0:
+                return
+            del self._users[key]
+            self._released[key] = time.monotonic()
+
     def _schedule_reaper(self):
         timer = threading.Timer(interval=self.sweap, function=self.reap)
         timer.setName('PortalReaper')
@@ -82,11 +111,21 @@ class Portal(collections.MutableMapping):
         timer.start()
 
     def reap(self):
-        """Remove tunnels who's TTL has expired."""
+        """Remove tunnels who's TTL has expired, close idle tunnels."""
         now = time.time()
         with self.lock:
+            idle = time.monotonic() - self.idle
+            for key, released in list(self._released.items()):
+                if released <= idle:
+                    del self._released[key]
+                    if key in self.data:
+                        del self[key]
+
             reaped_data = self.data.copy()
             for entry in reaped_data.items():
+                if entry[0] in self._users:
+                    # tunnel in use, keep it
+                    continue
                 if entry[1][1] < now:
                     del self.data[entry[0]]
                 else:
@@ -95,6 +134,19 @@ class Portal(collections.MutableMapping):
             self._schedule_reaper()
 
 
+_PORTAL = None
+_PORTAL_LOCK = threading.Lock()
+
+
+def shared_portal():
+    """Return Portal shared by all clients in this process."""
+    global _PORTAL  # pylint: disable=global-statement
+    with _PORTAL_LOCK:
+        if _PORTAL is None:
+            _PORTAL = Portal()
+        return _PORTAL
+
+
 class Tunnel():
     """SSH tunnel."""
 
@@ -1,5 +1,6 @@
 """Base for podman tests."""
 import sys
+import concurrent.futures
 import contextlib
 import functools
 import itertools
@@ -53,20 +54,21 @@ class PodmanTestCase(unittest.TestCase):
         def run_cmd(*args):
             cmd = list(itertools.chain(*args))
             try:
-                pid = subprocess.Popen(
+                # capture_output=True requires python 3.7
+                proc = subprocess.run(
                     cmd,
                     close_fds=True,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
+                    check=False,
                 )
-                out, _ = pid.communicate()
             except OSError as e:
                 print("{}: {}({})".format(cmd, e.strerror, e.errno))
             except ValueError as e:
                 print("{}: {}".format(cmd, e))
                 raise
             else:
-                return out.strip()
+                return proc.stdout.strip()
 
         tmpdir = os.environ.get("TMPDIR", "/tmp")
         podman_args = [
@@ -79,10 +81,14 @@ class PodmanTestCase(unittest.TestCase):
 
         run_podman = functools.partial(run_cmd, ["podman"], podman_args)
 
-        id_ = run_podman(["pull", "alpine"])
+        # Pulls are network bound and independent, run them together
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            alpine = pool.submit(run_podman, ["pull", "alpine"])
+            busybox = pool.submit(run_podman, ["pull", "busybox"])
+            id_ = alpine.result()
+            busybox.result()
         setattr(PodmanTestCase, "alpine_id", id_)
 
-        run_podman(["pull", "busybox"])
         run_podman(["images"])
 
         run_cmd(["rm", "-f", "{}/alpine_gold.tar".format(tmpdir)])
@@ -1,9 +1,17 @@
 from __future__ import absolute_import
 
+import subprocess
+import sys
+import threading
+import time
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
-from podman.client import BaseClient, Client, LocalClient
+from varlink import VarlinkError
+
+from podman.client import BaseClient, Client, LocalClient, RemoteClient
+from podman.libs.errors import ContainerNotFound
+from podman.libs.tunnel import Context, Portal, Tunnel
 
 
 class TestClient(unittest.TestCase):
@@ -32,3 +40,88 @@ class TestClient(unittest.TestCase):
 
         self.assertIsInstance(p._client, BaseClient)
         mock_ping.assert_called_once_with()
+
+    @patch('podman.client.VarlinkClient')
+    @patch('podman.libs.system.System.ping', return_value=True)
+    def test_connection_reused(self, mock_ping, mock_varlink):
+        with Client(uri='unix:/run/podman') as p:
+            with p._client() as first, p._client() as second:
+                self.assertIs(first, second)
+
+        mock_varlink.return_value.open.assert_called_once_with('io.podman')
+        first.close.assert_called_once_with()
+
+    @patch('podman.client.Tunnel')
+    @patch('podman.client.shared_portal')
+    def test_remote_tunnel_shared(self, mock_portal, mock_tunnel):
+        mock_portal.return_value = Portal(sweap=500)
+
+        def bore():
+            time.sleep(0.1)
+            return MagicMock(spec=Tunnel)
+
+        mock_tunnel.return_value.bore.side_effect = bore
+        client = RemoteClient(Context('unix:/tmp/podman.sock', 'io.podman'))
+        client.connect = MagicMock(side_effect=lambda: MagicMock())
+
+        def enter():
+            with client as podman:
+                self.assertIsNotNone(podman)
+
+        threads = [threading.Thread(target=enter) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        mock_tunnel.return_value.bore.assert_called_once_with()
+        self.assertEqual(client.connect.call_count, 2)
+        self.assertEqual(len(client._ifaces), 2)
+
+    @patch('podman.client.Tunnel')
+    @patch('podman.client.shared_portal')
+    def test_remote_dedicated(self, mock_portal, mock_tunnel):
+        portal = mock_portal.return_value = Portal(sweap=500)
+        mock_tunnel.return_value.bore.return_value = MagicMock(spec=Tunnel)
+        client = RemoteClient(Context('unix:/tmp/podman.sock', 'io.podman'))
+        client.connect = MagicMock()
+
+        with self.assertRaises(ContainerNotFound):
+            with client.dedicated() as podman:
+                # Tunnel is held while the connection is in use
+                self.assertEqual(portal._users['unix:/tmp/podman.sock'], 1)
+                raise VarlinkError({
+                    'error': 'io.podman.ContainerNotFound',
+                    'parameters': {'id': '1', 'reason': 'no such container'},
+                })
+
+        podman.close.assert_called_once_with()
+        self.assertNotIn('unix:/tmp/podman.sock', portal._users)
+        self.assertEqual(len(portal), 1)
+
+    @patch('podman.client.Tunnel')
+    @patch('podman.client.shared_portal')
+    def test_remote_batch(self, mock_portal, mock_tunnel):
+        portal = mock_portal.return_value = Portal(sweap=500)
+        mock_tunnel.return_value.bore.return_value = MagicMock(spec=Tunnel)
+        client = RemoteClient(Context('unix:/tmp/podman.sock', 'io.podman'))
+        client.connect = MagicMock(side_effect=lambda: MagicMock())
+
+        with client.batch():
+            # Tunnel is bored and held while the batch is open
+            self.assertEqual(portal._users['unix:/tmp/podman.sock'], 1)
+        mock_tunnel.return_value.bore.assert_called_once_with()
+        self.assertNotIn('unix:/tmp/podman.sock', portal._users)
+
+        first = client._ifaces[threading.get_ident()]
+        portal['unix:/tmp/podman.sock'] = MagicMock(spec=Tunnel)
+        with client.batch():
+            pass
+        # Connection made through the replaced tunnel is not reused
+        first.close.assert_called_once_with()
+        self.assertIsNot(client._ifaces[threading.get_ident()], first)
+
+    def test_lazy_import(self):
+        # Fresh interpreter, nothing has imported the subpackages yet
+        code = 'import podman; podman.libs.fold_keys; podman.client.Client'
+        subprocess.check_call([sys.executable, '-c', code])
@@ -1,4 +1,5 @@
 import datetime
+import json
 import unittest
 
 import podman
@@ -48,6 +49,42 @@ class TestLibs(unittest.TestCase):
         actual = podman.datetime_format(dt)
         self.assertEqual(actual, expected)
 
+    def test_fold_keys(self):
+        string = '{"Id": "c1", "Config": {"Env": ["A=1"]}, ' \
+            '"Mounts": [{"Type": "bind"}]}'
+        expected = {
+            'id': 'c1',
+            'config': {'env': ['A=1']},
+            'mounts': [{'type': 'bind'}],
+        }
+        self.assertEqual(podman.libs.loads_folded(string), expected)
+        self.assertEqual(
+            podman.libs.fold_keys_inplace(json.loads(string)), expected)
+        self.assertEqual(
+            json.loads(string, object_hook=podman.libs.fold_keys()),
+            expected)
+        self.assertIs(podman.libs.fold_keys(), podman.libs.fold_keys())
+
+        # Folded keys keep their position
+        string = '{"id": 1, "Name": "n", "Id2": 2, "config": {"B": 1, "a": 2}}'
+        self.assertEqual(
+            list(podman.libs.fold_keys_inplace(json.loads(string))),
+            ['id', 'name', 'id2', 'config'])
+        self.assertEqual(
+            list(podman.libs.fold_keys_inplace(json.loads(string))['config']),
+            ['b', 'a'])
+
+    def test_config_dict(self):
+        config = podman.libs.ConfigDict(a=1, b=None)
+        config['a'] = 2
+        config.update(b=None, c=3)
+        self.assertEqual(config, {'a': 1, 'c': 3})
+
+        self.assertEqual(config.setdefault('a', 4), 1)
+        self.assertIsNone(config.setdefault('b'))
+        self.assertEqual(config.setdefault('d', 5), 5)
+        self.assertEqual(config, {'a': 1, 'c': 3, 'd': 5})
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import logging
+import threading
 import time
 import unittest
 from unittest.mock import MagicMock, patch
@@ -49,6 +50,32 @@ class TestTunnel(unittest.TestCase):
         for entry in portal:
             self.assertIn(entry, (self.tunnel_01, self.tunnel_02))
 
+    def test_portal_idle(self):
+        portal = Portal(sweap=500, idle=0.1)
+        self.assertIsNone(portal.acquire('unix:/01'))
+        portal['unix:/01'] = self.tunnel_01
+        self.assertEqual(portal.acquire('unix:/01'), self.tunnel_01)
+
+        portal.release('unix:/01')
+        time.sleep(0.3)
+        portal.reap()
+        self.assertEqual(len(portal), 1)
+
+        # Releasing the last user does not start a thread each time
+        threads = threading.active_count()
+        portal.release('unix:/01')
+        for _ in range(100):
+            portal.acquire('unix:/01')
+            portal.release('unix:/01')
+        self.assertEqual(threading.active_count(), threads)
+
+        portal.reap()
+        self.assertEqual(len(portal), 1)
+        time.sleep(0.3)
+        portal.reap()
+        self.assertEqual(len(portal), 0)
+        self.tunnel_01.close.assert_called_once_with()
+
     @patch('subprocess.Popen')
     @patch('os.path.exists', return_value=True)
     @patch('weakref.finalize')
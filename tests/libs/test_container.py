@@ -0,0 +1,472 @@
+import functools
+import os
+import socket
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from varlink import VarlinkError, mock
+
+import podman
+from podman.libs.batch import Batch, Deferred
+from podman.libs.containers import Container
+from podman.libs.errors import ContainerNotFound
+from podman.libs._containers_attach import PseudoTTY
+
+
+ctnr_id_1 = "1840835294cf076a822e4e12ba4152411f131bd869e7f6a4e8b16df9b0ea5c7f"
+
+types = """
+type Container (
+    id: string,
+    image: string,
+    status: string,
+    containerrunning: bool
+)
+"""
+
+
+class ServiceContainer():
+
+    def GetContainer(self, id: str) -> str:
+        """return container: Container"""
+        return {
+            "container": {
+                "id": ("1840835294cf076a822e4e12ba4152411f"
+                       "131bd869e7f6a4e8b16df9b0ea5c7f"),
+                "image": "docker.io/library/alpine:latest",
+                "status": "running",
+                "containerrunning": True,
+            }
+        }
+
+    def ListContainers(self) -> str:
+        """return containers: []Container"""
+        return {
+            "containers": [
+                {
+                    "id": ("1840835294cf076a822e4e12ba4152411f"
+                           "131bd869e7f6a4e8b16df9b0ea5c7f"),
+                    "image": "docker.io/library/alpine:latest",
+                    "status": "running",
+                    "containerrunning": True,
+                }
+            ]
+        }
+
+    def GetContainersByContext(self, all: bool, latest: bool,
+                               args: object) -> str:
+        """return containers: []string"""
+        return {
+            "containers": [
+                "1840835294cf076a822e4e12ba4152411f"
+                "131bd869e7f6a4e8b16df9b0ea5c7f"
+            ]
+        }
+
+    def StartContainer(self, name: str) -> str:
+        """return container: string"""
+        return {"container": name}
+
+    def StopContainer(self, name: str, timeout: int) -> str:
+        """return container: string"""
+        return {"container": name}
+
+    def KillContainer(self, name: str, signal: int) -> str:
+        """return container: string"""
+        return {"container": name}
+
+    def RemoveContainer(self, name: str, force: bool) -> str:
+        """return container: string"""
+        return {"container": name}
+
+    def ContainerExists(self, name: str) -> int:
+        """return exists: int"""
+        return {"exists": 0}
+
+    def ContainerStateData(self, name: str) -> str:
+        """return config: string"""
+        return {"config": "{}"}
+
+    def InitContainer(self, name: str) -> str:
+        """return container: string"""
+        return {"container": name}
+
+    def ContainerCheckpoint(self, name: str, keep: bool, leaveRunning: bool,
+                            tcpEstablished: bool) -> str:
+        """return id: string"""
+        return {"id": name}
+
+    def ContainerRestore(self, name: str, keep: bool,
+                         tcpEstablished: bool) -> str:
+        """return id: string"""
+        return {"id": name}
+
+    def WaitContainer(self, name: str) -> int:
+        """return exitcode: int"""
+        return {"exitcode": 0}
+
+    def Commit(self, name: str, image_name: str, changes: object,
+               author: str, message: str, pause: bool) -> str:
+        """return reply: object"""
+        return {"reply": {"id": "1"}}
+
+    def GetVersion(self) -> str:
+        """return version"""
+        return {"version": "testing"}
+
+
+class TestContainer(unittest.TestCase):
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_batch(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnr = Container(client._client, ctnr_id_1, {"id": ctnr_id_1})
+            self.assertTrue(ctnr.running)
+
+            with client.batch():
+                removed = ctnr.remove(force=True)
+                self.assertIsInstance(removed, Deferred)
+                self.assertFalse(removed.done)
+
+                ctnrs = list(client.containers.list())
+                self.assertTrue(removed.done)
+
+            self.assertEqual(removed.result(), ctnr_id_1)
+            self.assertEqual(ctnrs[0]["id"], ctnr_id_1)
+            self.assertEqual(ctnr.remove(), ctnr_id_1)
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_batch_dedicated(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnr = Container(client._client, ctnr_id_1, {"id": ctnr_id_1})
+
+            with client.batch():
+                removed = ctnr.remove()
+                with client._client.dedicated():
+                    # Queued calls are sent before the dedicated ones
+                    self.assertTrue(removed.done)
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_batch_discard(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnr = Container(client._client, ctnr_id_1, {"id": ctnr_id_1})
+            iface = client._client.open()
+
+            with self.assertRaises(OSError):
+                with client.batch():
+                    with patch.object(iface, "_next_varlink_message",
+                                      side_effect=OSError):
+                        ctnr.remove().result()
+
+            # Connection with unread replies was dropped, not reused
+            self.assertIsNot(client._client.open(), iface)
+            self.assertEqual(ctnr.remove(), ctnr_id_1)
+
+    def test_copy(self):
+        ctnr = Container(None, ctnr_id_1, {"id": ctnr_id_1}, refresh=False)
+        copied = ctnr.copy()
+        self.assertIsInstance(copied, Container)
+        self.assertEqual(copied, ctnr)
+
+        copied["image"] = "changed"
+        self.assertNotIn("image", ctnr)
+
+    def test_deferred_repr(self):
+        batch = Batch(None)
+        reply = Deferred(batch)
+        batch._calls.append(reply)
+        self.assertEqual(repr(reply), "<Deferred pending>")
+
+        reply._set(value={"container": ctnr_id_1})
+        self.assertEqual(repr(reply["container"]),
+                         "<Deferred <Deferred {{'container': '{}'}}>"
+                         "['container']>".format(ctnr_id_1))
+
+        reply._set(error=VarlinkError({
+            "error": "io.podman.ContainerNotFound",
+            "parameters": {"id": ctnr_id_1, "reason": "no such container"},
+        }))
+        self.assertTrue(repr(reply).startswith("<Deferred error "))
+        # Showing a failed reply leaves its error to Batch.close()
+        with self.assertRaises(ContainerNotFound):
+            batch.close()
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_start_attached_in_batch(self):
+        stdin, stdout = os.pipe()
+        self.addCleanup(os.close, stdin)
+        self.addCleanup(os.close, stdout)
+
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnr = Container(client._client, ctnr_id_1, {"id": ctnr_id_1})
+            ctnr.pseudo_tty = PseudoTTY(stdin, stdout, "/io", "/ctl", b"\x04")
+
+            def connect(address):
+                # StartContainer has been sent before attaching
+                self.assertFalse(batch._pending)
+                raise ConnectionRefusedError()
+
+            with patch("podman.libs._containers_start.socket.socket") as skt:
+                skt.return_value.__enter__.return_value.connect.side_effect =\
+                    connect
+                with self.assertRaises(ConnectionRefusedError):
+                    with client.batch() as batch:
+                        ctnr.start()
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_refresh_retry(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnr = Container(client._client, ctnr_id_1, {"id": ctnr_id_1})
+            iface = client._client.open()
+
+            with patch.object(iface, "GetContainer",
+                              side_effect=BrokenPipeError):
+                ctnr._refresh(iface)
+            self.assertIsNot(client._client.open(), iface)
+
+            # Callers still holding the replaced connection keep working
+            self.assertTrue(ctnr._refresh(iface).running)
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_list_lite(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnrs = list(client.containers.list(lite=True))
+            self.assertEqual(ctnrs[0].id, ctnr_id_1)
+            self.assertNotIn("image", ctnrs[0])
+
+            self.assertTrue(ctnrs[0].refresh().running)
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_list_cache(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            list(client.containers.list())
+            self.assertEqual(client._client.listings, {})
+
+        with podman.Client(uri="unix:@podmantests", list_ttl=0.2) as client:
+            ctnrs = client.containers
+            listed = list(ctnrs.list())
+            listed[0]["image"] = "changed"
+            iface = client._client.open()
+
+            with patch.object(iface, "ListContainers",
+                              side_effect=AssertionError("not cached")):
+                cached = list(ctnrs.list())
+            self.assertEqual(cached[0].id, ctnr_id_1)
+            self.assertEqual(cached[0].image,
+                             "docker.io/library/alpine:latest")
+
+            # Changes made through the client discard the listing
+            cached[0].stop()
+            with patch.object(iface, "ListContainers",
+                              wraps=iface.ListContainers) as call:
+                list(ctnrs.list())
+            call.assert_called_once_with()
+
+            time.sleep(0.3)
+            with patch.object(iface, "ListContainers",
+                              wraps=iface.ListContainers) as call:
+                list(ctnrs.list())
+            call.assert_called_once_with()
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_exists(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            self.assertTrue(client.containers.exists(ctnr_id_1))
+            self.assertEqual(client._client.listings, {})
+
+        with podman.Client(uri="unix:@podmantests", list_ttl=0.2) as client:
+            self.assertTrue(client.containers.exists("a"))
+            iface = client._client.open()
+            with patch.object(iface, "ContainerExists",
+                              side_effect=AssertionError("not cached")):
+                self.assertTrue(client.containers.exists("a"))
+
+            # Expired answers are dropped once a new one is stored
+            time.sleep(0.3)
+            self.assertTrue(client.containers.exists("b"))
+            self.assertEqual(list(client._client.listings), [("exists", "b")])
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_fan_out(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnrs = client.containers.list_parallel(max_workers=2)
+            self.assertEqual(ctnrs[0].image, "docker.io/library/alpine:latest")
+
+            actual = client.containers.remove_many([ctnr_id_1, ctnr_id_1])
+            self.assertEqual(actual, [ctnr_id_1, ctnr_id_1])
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_refresh_after(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnr = Container(client._client, ctnr_id_1, {"id": ctnr_id_1})
+
+            ctnr.stop(refresh=False)
+            self.assertIsNone(ctnr.running)
+
+            self.assertIs(ctnr.refresh_after(ctnr.stop, ctnr.start), ctnr)
+            self.assertTrue(ctnr.running)
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_inspect_cache(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnr = Container(client._client, ctnr_id_1, {"id": ctnr_id_1})
+            iface = client._client.open()
+
+            changes = (
+                ctnr.refresh,
+                functools.partial(ctnr.stop, refresh=False),
+                functools.partial(ctnr.commit, "image"),
+                ctnr.remove,
+                ctnr.init,
+                ctnr.checkpoint,
+                ctnr.restore,
+                ctnr.wait,
+            )
+            with patch.object(iface, "ContainerStateData",
+                              wraps=iface.ContainerStateData) as call:
+                self.assertEqual(ctnr.state_data(), "{}")
+                self.assertEqual(ctnr.state_data(), "{}")
+                call.assert_called_once_with(ctnr_id_1)
+
+                for change in changes:
+                    with self.subTest(change=change):
+                        call.reset_mock()
+                        change()
+                        ctnr.state_data()
+                        ctnr.state_data()
+                        call.assert_called_once_with(ctnr_id_1)
+
+    def kill_client(self, client, wait_container):
+        """Patch connections of client, return list of connections made."""
+        connect = client._client.connect
+        ifaces = []
+
+        def connected():
+            iface = connect()
+            iface.WaitContainer = MagicMock(wraps=iface.WaitContainer,
+                                            side_effect=wait_container)
+            ifaces.append(iface)
+            return iface
+
+        patcher = patch.object(client._client, "connect", connected)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return ifaces
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_kill_wait(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnr = Container(client._client, ctnr_id_1, {"id": ctnr_id_1})
+            ifaces = self.kill_client(client, None)
+
+            self.assertIs(ctnr.kill(wait=5), ctnr)
+            # Service blocks on a dedicated connection, with the timeout set
+            dedicated, = ifaces
+            dedicated.WaitContainer.assert_called_once_with(ctnr_id_1)
+            self.assertEqual(dedicated._connection.gettimeout(), 5)
+
+            ctnr.kill(wait=0)
+            self.assertIsNone(ifaces[-1]._connection.gettimeout())
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_kill_poll(self):
+        error = VarlinkError({
+            "error": "org.varlink.service.MethodNotImplemented",
+            "parameters": {"method": "WaitContainer"},
+        })
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnr = Container(client._client, ctnr_id_1, {"id": ctnr_id_1})
+            iface = client._client.open()
+            ifaces = self.kill_client(client, error)
+
+            running = iface.GetContainer(ctnr_id_1)
+            exited = {"container": dict(running["container"],
+                                        status="exited")}
+            with patch.object(iface, "GetContainer",
+                              side_effect=[running, exited]) as call:
+                # Without WaitContainer, status is polled until it changes
+                self.assertEqual(ctnr.kill(wait=5).status, "exited")
+            self.assertEqual(call.call_count, 2)
+            ifaces[0].WaitContainer.assert_called_once_with(ctnr_id_1)
+
+            with self.assertRaises(TimeoutError):
+                ctnr.kill(wait=0.1)
+
+    @mock.mockedservice(
+        fake_service=ServiceContainer,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    def test_kill_timeout(self):
+        with podman.Client(uri="unix:@podmantests") as client:
+            ctnr = Container(client._client, ctnr_id_1, {"id": ctnr_id_1})
+            self.kill_client(client, socket.timeout)
+
+            with self.assertRaises(TimeoutError):
+                ctnr.kill(wait=0.1)
@@ -0,0 +1,101 @@
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from podman.client import LocalClient
+from podman.libs.images import Images
+from podman.libs.tunnel import Context
+
+
+class FakeConnection():
+    """Stand in for a varlink connection used by Images.build()."""
+
+    def __init__(self):
+        self.sent = bytearray()
+        self.config = None
+        self._connection = self
+
+    def sendall(self, data):
+        self.sent += data
+
+    def SendFile(self, type_, length, _upgrade=False):
+        return {"file_handle": "/var/tmp/context"}
+
+    def BuildImage(self, build, _more=False):
+        self.config = build
+        return iter([{"image": {"logs": [], "id": "1"}}])
+
+    def GetImage(self, id_):
+        return {"image": {"id": id_}}
+
+    def close(self):
+        pass
+
+
+class TestImage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.context = self.tmpdir.name
+        os.mkdir(os.path.join(self.context, "sub"))
+        with open(os.path.join(self.context, "Dockerfile"), "w") as file:
+            file.write("FROM alpine\n")
+        with open(os.path.join(self.context, "sub", "a.txt"), "w") as file:
+            file.write("a\n")
+        os.symlink("a.txt", os.path.join(self.context, "sub", "link"))
+
+        self.connection = FakeConnection()
+        self.client = LocalClient(Context("unix:/run/podman", "io.podman"))
+        patcher = patch.object(self.client, "connect",
+                               return_value=self.connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def build(self, **kwargs):
+        # Build runs as its replies are consumed
+        return list(Images(self.client).build(
+            context_directory=self.context, tags=["localhost/test"],
+            **kwargs)())
+
+    def test_build_dockerfiles(self):
+        output = self.build()
+        self.assertEqual(output[-1][1].id, "1")
+
+        self.assertEqual(self.connection.config["dockerfiles"], ["Dockerfile"])
+        self.assertEqual(self.connection.config["contextDir"],
+                         "/var/tmp/context")
+
+        os.remove(os.path.join(self.context, "Dockerfile"))
+        with self.assertRaises(ValueError):
+            self.build()
+
+    def check_context(self, compressed):
+        sent = bytes(self.connection.sent)
+        self.assertEqual(sent[:2] == b"\x1f\x8b", compressed)
+
+        with tarfile.open(fileobj=io.BytesIO(sent)) as tar:
+            self.assertEqual(sorted(tar.getnames()),
+                             ["Dockerfile", "sub/a.txt", "sub/link"])
+            self.assertEqual(
+                tar.extractfile("Dockerfile").read(), b"FROM alpine\n")
+            self.assertEqual(tar.extractfile("sub/a.txt").read(), b"a\n")
+            self.assertTrue(tar.getmember("sub/link").issym())
+            self.assertEqual(tar.getmember("sub/link").linkname, "a.txt")
+
+    def test_build_context(self):
+        self.build()
+        self.check_context(compressed=False)
+
+    def test_build_context_compressed(self):
+        self.build(compress=True)
+        self.check_context(compressed=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,12 @@
 import unittest
+from unittest.mock import MagicMock, patch
 from varlink import mock
 import varlink
 
 import podman
+from podman.client import RemoteClient
 from podman.libs.pods import Pod
+from podman.libs.tunnel import Context, Portal, Tunnel
 
 
 pod_id_1 = "135d71b9495f7c3967f536edad57750bfdb569336cd107d8aabab45565ffcfb6"
@@ -84,4 +87,26 @@ class TestPod(unittest.TestCase):
     def test_start(self):
         client = podman.Client(uri="unix:@podmantests")
         pod = Pod(client._client, short_pod_id_1, {"foo": "bar"})
+        client._client.listings[('containers', False)] = ([], 0)
         self.assertEqual(pod.start()["numberofcontainers"], "2")
+        self.assertEqual(client._client.listings, {})
+
+    @mock.mockedservice(
+        fake_service=ServicePod,
+        fake_types=types,
+        name='io.podman',
+        address='unix:@podmantests'
+    )
+    @patch('podman.client.Tunnel')
+    @patch('podman.client.shared_portal')
+    def test_start_remote(self, mock_portal, mock_tunnel):
+        portal = mock_portal.return_value = Portal(sweap=500)
+        mock_tunnel.return_value.bore.return_value = MagicMock(spec=Tunnel)
+        client = RemoteClient(Context("unix:@podmantests", "io.podman"))
+
+        pod = Pod(client, short_pod_id_1, {"foo": "bar"}, refresh=False)
+        self.assertEqual(pod.start()["numberofcontainers"], "2")
+        # Pod actions go through the ssh tunnel
+        mock_tunnel.return_value.bore.assert_called_once_with()
+        self.assertEqual(len(portal), 1)
+        client.close()